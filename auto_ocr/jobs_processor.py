@@ -2,14 +2,17 @@ import logging
 import os
 import shutil
 import subprocess
+import time
 from dataclasses import dataclass
+from datetime import timedelta
 from enum import Enum
 from pathlib import Path
 from subprocess import CalledProcessError
-from typing import List, Optional, Union
+from typing import Iterator, List, Optional, Tuple, Union
 
+from auto_ocr.pdf_index import PdfIndex, count_pages
 from auto_ocr.utils import PathTools as PT
-from auto_ocr.utils import append_list_to_json, load_list_from_json
+from auto_ocr.utils import append_list_to_json, format_bytes, load_list_from_json
 
 
 class CopyMode(Enum):
@@ -102,6 +105,20 @@ class JobConfig:
         )
 
 
+@dataclass
+class JobPlan:
+    job_name: str
+    pending_files: int = 0
+    total_pages: int = 0
+    total_bytes: int = 0
+    files_with_text: int = 0
+    files_with_unknown_text: int = 0
+    encrypted_files: int = 0
+    unreadable_files: int = 0
+    pages_to_ocr: int = 0
+    eta_seconds: Optional[float] = None
+
+
 class JobsProcessor:
     def __init__(self):
         path_of_job_defs_json = PT.get_path_of_job_defs_json()
@@ -128,6 +145,11 @@ Example job definition:
         self.path_of_done_files_json = PT.get_path_of_done_files_json()
         self.all_done_files = load_list_from_json(self.path_of_done_files_json)
 
+        self.path_of_ocr_history_json = PT.get_path_of_ocr_history_json()
+        self.ocr_history = load_list_from_json(self.path_of_ocr_history_json)
+
+        self.pdf_index = PdfIndex()
+
     def get_done_file_names_for(self, job_name: str) -> List[str]:
         already_done_file_names = []
         for done_file in self.all_done_files:
@@ -191,8 +213,12 @@ Example job definition:
                 logging.info("Destination file is already a hardlink of %r", file_name)
         return True
 
-    def run_ocr(self, source_file_path: Path) -> bool:
+    def run_ocr(self, job: JobConfig, source_file_path: Path) -> bool:
+        # Only used for the page count of the throughput history, ocrmypdf decides if OCR is needed
+        info = self.pdf_index.get_if_indexed(source_file_path)
+
         logging.info("Running OCR on %s", source_file_path.name)
+        start_time = time.monotonic()
         try:
             subprocess.run(
                 [
@@ -215,66 +241,202 @@ Example job definition:
             else:
                 logging.error("ocrmypdf failed %s", ocr_err)
                 return False
+            return True
+
+        ocr_seconds = time.monotonic() - start_time
+        if info is not None and info.readable:
+            pages = info.pages
+        else:
+            # Counting pages is cheap compared to the text analysis of the index
+            pages = count_pages(source_file_path)
+        if pages is not None:
+            self.record_ocr_throughput(job, source_file_path, pages, ocr_seconds)
+        # The file got rewritten by ocrmypdf, so the indexed info is outdated
+        self.pdf_index.remove(source_file_path)
         return True
 
-    def process_single_dir_job(
+    def record_ocr_throughput(self, job: JobConfig, source_file_path: Path, pages: int, seconds: float):
+        """Store how long the OCR of a file took, this is used to estimate the duration of a backlog"""
+        history_entry = {
+            "job_name": job.name,
+            "file_name": source_file_path.name,
+            "pages": pages,
+            "seconds": round(seconds, 3),
+        }
+        self.ocr_history.append(history_entry)
+        append_list_to_json(self.path_of_ocr_history_json, [history_entry])
+
+    def get_seconds_per_page(self, job_name: str) -> Optional[float]:
+        """
+        Return the average OCR time per page recorded for a job.
+        Falls back to the history of all jobs if the job has no history yet.
+        """
+        for only_this_job in (True, False):
+            total_pages = 0
+            total_seconds = 0.0
+            for history_entry in self.ocr_history:
+                if only_this_job and history_entry.get("job_name", None) != job_name:
+                    continue
+                pages = history_entry.get("pages", None)
+                seconds = history_entry.get("seconds", None)
+                if not pages or seconds is None:
+                    continue
+                total_pages += pages
+                total_seconds += seconds
+            if total_pages > 0:
+                return total_seconds / total_pages
+        return None
+
+    def iter_pending_files_in_dir(
         self,
         job: JobConfig,
         source_dir: Path,
         sub_source_dir: Path,
         already_done_file_names: List[str],
-    ):
-
+    ) -> Iterator[Path]:
+        """Yield all PDFs in a single directory that are not done yet"""
         full_source_dir = source_dir / sub_source_dir
         for source_file_path in full_source_dir.iterdir():
             if source_file_path.is_file() and source_file_path.suffix.lower() == '.pdf':
                 if job.use_done_file_names_list and source_file_path.name in already_done_file_names:
                     continue
+                yield source_file_path
+
+    def iter_source_dirs(self, job: JobConfig) -> Iterator[Tuple[Path, Path]]:
+        """Yield the source directory and the sub directory of each directory that has to be processed"""
+        for source_dir in job.sources:
+            if job.input_mode is InputMode.SINGLE_FOLDER:
+                yield source_dir, Path('.')
+            elif job.input_mode is InputMode.DEEP_TREE:
+                for root, _, _ in os.walk(source_dir):
+                    yield source_dir, Path(root).relative_to(source_dir)
+
+    def process_single_dir_job(
+        self,
+        job: JobConfig,
+        source_dir: Path,
+        sub_source_dir: Path,
+        already_done_file_names: List[str],
+    ):
+
+        for source_file_path in self.iter_pending_files_in_dir(
+            job, source_dir, sub_source_dir, already_done_file_names
+        ):
+            logging.info("Working on %s", source_file_path.name)
+
+            if job.do_ocr:
+                if not self.run_ocr(job, source_file_path):
+                    continue
+            else:
+                logging.info("Skip ocr file!")
+
+            if job.copy_mode != CopyMode.NO_COPY:
+                if any(
+                    not self.copy_file(job, source_dir, sub_source_dir, source_file_path.name, dest_dir)
+                    for dest_dir in job.destinations
+                ):
+                    continue
+            else:
+                logging.info("Skip copy file!")
+
+            if job.delete_source_at_end:
+                try:
+                    source_file_path.unlink()
+                    self.pdf_index.remove(source_file_path)
+                    logging.info("Source file deleted")
+                except OSError as delete_err:
+                    logging.error("Error while removing source file: %s", delete_err)
 
-                logging.info("Working on %s", source_file_path.name)
-
-                if job.do_ocr:
-                    if not self.run_ocr(source_file_path):
-                        continue
-                else:
-                    logging.info("Skip ocr file!")
-
-                if job.copy_mode != CopyMode.NO_COPY:
-                    if any(
-                        not self.copy_file(job, source_dir, sub_source_dir, source_file_path.name, dest_dir)
-                        for dest_dir in job.destinations
-                    ):
-                        continue
-                else:
-                    logging.info("Skip copy file!")
-
-                if job.delete_source_at_end:
-                    try:
-                        source_file_path.unlink()
-                        logging.info("Source file deleted")
-                    except OSError as delete_err:
-                        logging.error("Error while removing source file: %s", delete_err)
-
-                now_finished_file = [{"file_name": source_file_path.name, "job_name": job.name}]
-                append_list_to_json(self.path_of_done_files_json, now_finished_file)
+            now_finished_file = [{"file_name": source_file_path.name, "job_name": job.name}]
+            append_list_to_json(self.path_of_done_files_json, now_finished_file)
 
     def process_job(self, job: JobConfig):
         """Start a ocr process for each input path in that job"""
         already_done_file_names = self.get_done_file_names_for(job.name)
 
-        for source_dir in job.sources:
-            if job.input_mode is InputMode.SINGLE_FOLDER:
-                self.process_single_dir_job(job, source_dir, Path('.'), already_done_file_names)
-            elif job.input_mode is InputMode.DEEP_TREE:
-                for root, _, _ in os.walk(source_dir):
-                    relative_path = Path(root).relative_to(source_dir)
-                    self.process_single_dir_job(job, source_dir, relative_path, already_done_file_names)
+        for source_dir, sub_source_dir in self.iter_source_dirs(job):
+            self.process_single_dir_job(job, source_dir, sub_source_dir, already_done_file_names)
 
-    def process(self):
-        """Parse every job and start processing it"""
+    def plan_job(self, job: JobConfig) -> JobPlan:
+        """Collect the pending work of a job without running OCR or copying anything"""
+        already_done_file_names = self.get_done_file_names_for(job.name)
+        job_plan = JobPlan(job_name=job.name)
+
+        for source_dir, sub_source_dir in self.iter_source_dirs(job):
+            for source_file_path in self.iter_pending_files_in_dir(
+                job, source_dir, sub_source_dir, already_done_file_names
+            ):
+                try:
+                    info = self.pdf_index.get(source_file_path)
+                except OSError as stat_err:
+                    logging.warning("Could not access %s: %s", source_file_path, stat_err)
+                    continue
+
+                job_plan.pending_files += 1
+                job_plan.total_bytes += info.size
+                if not info.readable:
+                    if info.encrypted:
+                        job_plan.encrypted_files += 1
+                    else:
+                        job_plan.unreadable_files += 1
+                    continue
+
+                job_plan.total_pages += info.pages
+                if info.has_text:
+                    job_plan.files_with_text += 1
+                elif info.encrypted:
+                    job_plan.encrypted_files += 1
+                elif info.text_unknown:
+                    job_plan.files_with_unknown_text += 1
+                elif job.do_ocr:
+                    job_plan.pages_to_ocr += info.pages
+
+        seconds_per_page = self.get_seconds_per_page(job.name)
+        if job_plan.pages_to_ocr == 0:
+            job_plan.eta_seconds = 0.0
+        elif seconds_per_page is not None:
+            job_plan.eta_seconds = job_plan.pages_to_ocr * seconds_per_page
+        return job_plan
+
+    @staticmethod
+    def log_job_plan(job_plan: JobPlan):
+        if job_plan.eta_seconds is None:
+            eta = "unknown (no OCR throughput recorded yet)"
+        else:
+            eta = str(timedelta(seconds=round(job_plan.eta_seconds)))
+
+        logging.info("Plan for job %r:", job_plan.job_name)
+        logging.info("  Pending files:      %d", job_plan.pending_files)
+        logging.info("  Total pages:        %d", job_plan.total_pages)
+        logging.info("  Total size:         %s", format_bytes(job_plan.total_bytes))
+        logging.info("  Already with text:  %d", job_plan.files_with_text)
+        logging.info("  Text unknown:       %d", job_plan.files_with_unknown_text)
+        logging.info("  Encrypted:          %d", job_plan.encrypted_files)
+        logging.info("  Unreadable:         %d", job_plan.unreadable_files)
+        logging.info("  Pages to OCR:       %d", job_plan.pages_to_ocr)
+        logging.info("  Estimated OCR time: %s", eta)
+
+    def parse_jobs(self) -> Iterator[JobConfig]:
         for idx, job_dict in enumerate(self.job_definitions):
             try:
-                job = JobConfig.from_dict(job_dict)
+                yield JobConfig.from_dict(job_dict)
             except (ValueError, TypeError) as parse_error:
                 raise RuntimeError(f"Could not parse job {idx}") from parse_error
-            self.process_job(job)
+
+    def process(self):
+        """Parse every job and start processing it"""
+        try:
+            for job in self.parse_jobs():
+                self.process_job(job)
+                self.pdf_index.save()
+        finally:
+            self.pdf_index.save()
+
+    def plan(self):
+        """Parse every job and report its pending work, nothing gets OCRed, copied or deleted"""
+        try:
+            for job in self.parse_jobs():
+                self.log_job_plan(self.plan_job(job))
+                self.pdf_index.save()
+        finally:
+            self.pdf_index.save()
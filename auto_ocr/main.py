@@ -104,6 +104,18 @@ def get_parser():
         ),
     )
 
+    group.add_argument(
+        "-p",
+        "--plan",
+        dest="plan",
+        action="store_true",
+        help=(
+            "Dry run of all job definitions. Report the pending files, pages, sizes and an estimated OCR time per job"
+            + " without running OCR, copying or deleting anything. Page counts are stored in an index that is"
+            + " reused by --process-jobs"
+        ),
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -171,6 +183,9 @@ def main(args=None):
         if args.process_jobs:
             jobs_processor = JobsProcessor()
             jobs_processor.process()
+        elif args.plan:
+            jobs_processor = JobsProcessor()
+            jobs_processor.plan()
 
         logging.info("All done. Exiting..")
         process_unlock()
@@ -0,0 +1,149 @@
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import pikepdf
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LTPage, LTTextContainer
+
+from auto_ocr.utils import PathTools as PT
+from auto_ocr.utils import load_list_from_json, write_list_to_json
+
+# Like ocrmypdf, text in the outer eighth of a page (scanner footers, fax headers, Bates stamps) is ignored
+MARGIN_RATIO = 0.125
+
+# Number of changed entries after which the index is written to disk
+SAVE_INTERVAL = 50
+
+
+@dataclass
+class PdfInfo:
+    path: str
+    size: int
+    mtime_ns: int
+    pages: Optional[int] = None
+    has_text: bool = False
+    text_unknown: bool = False
+    encrypted: bool = False
+
+    @property
+    def readable(self) -> bool:
+        return self.pages is not None
+
+    def matches(self, stat_result: os.stat_result) -> bool:
+        """Return if this entry still describes the file with the given stat"""
+        return self.size == stat_result.st_size and self.mtime_ns == stat_result.st_mtime_ns
+
+
+def page_has_text(page: LTPage) -> bool:
+    """
+    Return if a page has text in its interior, this follows the rule ocrmypdf
+    uses to decide if a page already has text.
+    """
+    x0, y0, x1, y1 = page.bbox
+    margin_x = (x1 - x0) * MARGIN_RATIO
+    margin_y = (y1 - y0) * MARGIN_RATIO
+    for element in page:
+        if not isinstance(element, LTTextContainer) or not element.get_text().strip():
+            continue
+        if (
+            element.x0 < x1 - margin_x
+            and element.x1 > x0 + margin_x
+            and element.y0 < y1 - margin_y
+            and element.y1 > y0 + margin_y
+        ):
+            return True
+    return False
+
+
+def read_pdf_info(file_path: Path, stat_result: os.stat_result) -> PdfInfo:
+    """Open a PDF and count its pages and check if it already contains text"""
+    info = PdfInfo(path=str(file_path), size=stat_result.st_size, mtime_ns=stat_result.st_mtime_ns)
+    try:
+        with pikepdf.open(file_path) as pdf:
+            info.pages = len(pdf.pages)
+            info.encrypted = pdf.is_encrypted
+    except pikepdf.PasswordError:
+        info.encrypted = True
+    except (pikepdf.PdfError, OSError) as read_err:
+        logging.warning("Could not read %s: %s", file_path.name, read_err)
+
+    if not info.readable or info.encrypted:
+        return info
+
+    try:
+        info.has_text = any(page_has_text(page) for page in extract_pages(file_path))
+    except Exception as analyse_err:  # pylint: disable=broad-except
+        # pdfminer raises all kinds of errors on malformed PDFs that pikepdf can still repair
+        logging.warning("Could not analyse text of %s: %r", file_path.name, analyse_err)
+        info.text_unknown = True
+    return info
+
+
+def count_pages(file_path: Path) -> Optional[int]:
+    """Return the number of pages of a PDF or None if it can not be read"""
+    try:
+        with pikepdf.open(file_path) as pdf:
+            return len(pdf.pages)
+    except (pikepdf.PdfError, OSError) as read_err:
+        logging.warning("Could not count pages of %s: %s", file_path.name, read_err)
+        return None
+
+
+class PdfIndex:
+    """
+    A persistent cache of page counts and text classifications of PDFs.
+    Entries are keyed by the absolute file path and are only reused as long as
+    size and modification time of the file did not change.
+    """
+
+    def __init__(self):
+        self.path_of_pdf_index_json = PT.get_path_of_pdf_index_json()
+        self.entries: Dict[str, PdfInfo] = {}
+        for entry in load_list_from_json(self.path_of_pdf_index_json):
+            try:
+                info = PdfInfo(**entry)
+            except TypeError:
+                continue
+            self.entries[info.path] = info
+        self.unsaved_changes = 0
+
+    def get(self, file_path: Path) -> PdfInfo:
+        """Return the info of a PDF, the file is only opened if it is not indexed or changed since"""
+        stat_result = file_path.stat()
+        info = self.entries.get(str(file_path), None)
+        if info is not None and info.matches(stat_result):
+            return info
+
+        info = read_pdf_info(file_path, stat_result)
+        self.entries[info.path] = info
+        self._mark_changed()
+        return info
+
+    def get_if_indexed(self, file_path: Path) -> Optional[PdfInfo]:
+        """Return the info of a PDF if it is indexed and unchanged, the file itself is never opened"""
+        info = self.entries.get(str(file_path), None)
+        try:
+            if info is not None and info.matches(file_path.stat()):
+                return info
+        except OSError:
+            pass
+        return None
+
+    def remove(self, file_path: Path):
+        if self.entries.pop(str(file_path), None) is not None:
+            self._mark_changed()
+
+    def _mark_changed(self):
+        # Save from time to time, a stopped container does not run the final save
+        self.unsaved_changes += 1
+        if self.unsaved_changes >= SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        if self.unsaved_changes == 0:
+            return
+        write_list_to_json(self.path_of_pdf_index_json, [asdict(info) for info in self.entries.values()])
+        self.unsaved_changes = 0
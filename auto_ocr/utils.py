@@ -49,6 +49,15 @@ def process_unlock():
         pass
 
 
+def format_bytes(size: float) -> str:
+    """Return a human readable representation of a size in bytes"""
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(size) < 1024:
+            return f"{int(size)} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
 def load_list_from_json(json_file_path: str) -> List[Dict]:
     """
     Return the list stored in a json file or an empty list
@@ -101,6 +110,24 @@ def append_list_to_json(json_file_path: str, list_to_append: List[Dict]):
             o_file.close()
 
 
+def write_list_to_json(json_file_path: str, list_to_write: List[Dict]):
+    """
+    This writes a list of dictionaries to a json file, replacing its previous content.
+    The output format is the same as used by append_list_to_json.
+    The file is first written to a temporary file and then moved into place,
+    so an interrupted run does not leave a truncated json file behind.
+    """
+    # pylint: disable=maybe-no-member
+    json_bytes = orjson.dumps(list_to_write, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    tmp_file_path = json_file_path + ".tmp"
+    try:
+        with open(tmp_file_path, "wb") as o_file:
+            o_file.write(json_bytes)
+        os.replace(tmp_file_path, json_file_path)
+    except (OSError, IOError) as err:
+        logging.error("Error: Could not write List to json: %r Reason: %s", json_file_path, err)
+
+
 class PathTools:
     """A set of methods to create correct paths."""
 
@@ -177,3 +204,11 @@ class PathTools:
     @staticmethod
     def get_path_of_done_files_json():
         return str(Path(PathTools.get_project_data_directory()) / "done_files.json")
+
+    @staticmethod
+    def get_path_of_pdf_index_json():
+        return str(Path(PathTools.get_project_data_directory()) / "pdf_index.json")
+
+    @staticmethod
+    def get_path_of_ocr_history_json():
+        return str(Path(PathTools.get_project_data_directory()) / "ocr_history.json")
@@ -0,0 +1,47 @@
+import pikepdf
+import pytest
+
+from auto_ocr.utils import PathTools
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+HELVETICA = pikepdf.Dictionary(
+    Type=pikepdf.Name.Font,
+    Subtype=pikepdf.Name.Type1,
+    BaseFont=pikepdf.Name.Helvetica,
+)
+
+
+@pytest.fixture(autouse=True)
+def project_dirs(tmp_path, monkeypatch):
+    """Keep job definitions, done list, history and index of the tests in a temporary directory"""
+    config_dir = tmp_path / "config"
+    data_dir = tmp_path / "data"
+    config_dir.mkdir()
+    data_dir.mkdir()
+    monkeypatch.setattr(PathTools, "get_project_config_directory", staticmethod(lambda: str(config_dir)))
+    monkeypatch.setattr(PathTools, "get_project_data_directory", staticmethod(lambda: str(data_dir)))
+    return config_dir, data_dir
+
+
+@pytest.fixture
+def make_pdf():
+    """Return a function that writes a PDF where every page draws the given content stream"""
+
+    def _make_pdf(file_path, content: bytes = b"", pages: int = 1, fonts=None, encryption=None):
+        pdf = pikepdf.new()
+        for _ in range(pages):
+            pdf.add_blank_page(page_size=(PAGE_WIDTH, PAGE_HEIGHT))
+        for page in pdf.pages:
+            page.obj.Contents = pdf.make_stream(content)
+            page.obj.Resources = pikepdf.Dictionary(Font=pikepdf.Dictionary(fonts or {"/F1": HELVETICA}))
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        if encryption is None:
+            pdf.save(file_path)
+        else:
+            pdf.save(file_path, encryption=encryption)
+        return file_path
+
+    return _make_pdf
@@ -0,0 +1,191 @@
+import subprocess
+from subprocess import CalledProcessError
+
+import orjson
+import pikepdf
+import pytest
+
+from auto_ocr.jobs_processor import CopyMode, JobConfig, JobsProcessor
+from auto_ocr.utils import PathTools as PT
+from auto_ocr.utils import append_list_to_json, load_list_from_json
+
+INTERIOR_TEXT = b"BT /F1 12 Tf 200 400 Td (Hello World) Tj ET"
+SCANNER_FOOTER = b"BT /F1 8 Tf 40 20 Td (Scanned 2024-01-01) Tj ET"
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    path = tmp_path / "source"
+    path.mkdir()
+    return path
+
+
+def make_job(source_dir, **kwargs):
+    return JobConfig(name="Job", sources=str(source_dir), copy_mode=CopyMode.NO_COPY, **kwargs)
+
+
+def write_history(entries):
+    append_list_to_json(PT.get_path_of_ocr_history_json(), entries)
+
+
+@pytest.fixture
+def fake_ocrmypdf(monkeypatch):
+    """Replace ocrmypdf, by default it rewrites the file like a successful OCR run"""
+    calls = []
+    state = {"returncode": 0}
+
+    def _run(cmd, check):
+        calls.append(cmd)
+        if state["returncode"] != 0:
+            raise CalledProcessError(state["returncode"], cmd)
+        with pikepdf.open(cmd[-1], allow_overwriting_input=True) as pdf:
+            pdf.docinfo["/Producer"] = "fake ocrmypdf"
+            pdf.save(cmd[-1])
+
+    monkeypatch.setattr(subprocess, "run", _run)
+    return calls, state
+
+
+def test_plan_job_counts(source_dir, make_pdf):
+    make_pdf(source_dir / "scan.pdf", SCANNER_FOOTER, pages=3)
+    make_pdf(source_dir / "sub" / "text.pdf", INTERIOR_TEXT, pages=2)
+    make_pdf(source_dir / "secret.pdf", encryption=pikepdf.Encryption(owner="owner", user="user"))
+    (source_dir / "broken.pdf").write_bytes(b"not a pdf")
+    (source_dir / "notes.txt").write_bytes(b"not a pdf either")
+    total_bytes = sum(path.stat().st_size for path in source_dir.rglob("*.pdf"))
+
+    job_plan = JobsProcessor().plan_job(make_job(source_dir))
+
+    assert job_plan.pending_files == 4
+    assert job_plan.total_bytes == total_bytes
+    assert job_plan.total_pages == 5
+    assert job_plan.files_with_text == 1
+    assert job_plan.files_with_unknown_text == 0
+    assert job_plan.encrypted_files == 1
+    assert job_plan.unreadable_files == 1
+    assert job_plan.pages_to_ocr == 3
+    assert job_plan.eta_seconds is None
+
+
+def test_plan_job_reports_unknown_text_separately(source_dir, make_pdf):
+    file_path = make_pdf(source_dir / "truncated.pdf", INTERIOR_TEXT)
+    pdf_bytes = file_path.read_bytes()
+    file_path.write_bytes(pdf_bytes[: int(len(pdf_bytes) * 0.8)])
+
+    job_plan = JobsProcessor().plan_job(make_job(source_dir))
+
+    assert job_plan.files_with_unknown_text == 1
+    assert job_plan.pages_to_ocr == 0
+
+
+def test_plan_job_without_ocr(source_dir, make_pdf):
+    make_pdf(source_dir / "scan.pdf", pages=3)
+
+    job_plan = JobsProcessor().plan_job(make_job(source_dir, do_ocr=False))
+
+    assert job_plan.pending_files == 1
+    assert job_plan.total_pages == 3
+    assert job_plan.pages_to_ocr == 0
+    assert job_plan.eta_seconds == 0.0
+
+
+def test_plan_job_skips_done_files(source_dir, make_pdf):
+    make_pdf(source_dir / "done.pdf", pages=2)
+    make_pdf(source_dir / "pending.pdf", pages=3)
+    append_list_to_json(
+        PT.get_path_of_done_files_json(),
+        [{"file_name": "done.pdf", "job_name": "Job"}, {"file_name": "pending.pdf", "job_name": "OtherJob"}],
+    )
+
+    job_plan = JobsProcessor().plan_job(make_job(source_dir))
+
+    assert job_plan.pending_files == 1
+    assert job_plan.pages_to_ocr == 3
+
+
+def test_plan_job_estimates_time(source_dir, make_pdf):
+    make_pdf(source_dir / "scan.pdf", pages=4)
+    write_history([{"job_name": "Job", "file_name": "old.pdf", "pages": 2, "seconds": 5.0}])
+
+    job_plan = JobsProcessor().plan_job(make_job(source_dir))
+
+    assert job_plan.eta_seconds == pytest.approx(10.0)
+
+
+def test_seconds_per_page_prefers_job_history():
+    write_history(
+        [
+            {"job_name": "Job", "file_name": "a.pdf", "pages": 2, "seconds": 4.0},
+            {"job_name": "Job", "file_name": "b.pdf", "pages": 3, "seconds": 11.0},
+            {"job_name": "OtherJob", "file_name": "c.pdf", "pages": 10, "seconds": 100.0},
+        ]
+    )
+    jobs_processor = JobsProcessor()
+
+    assert jobs_processor.get_seconds_per_page("Job") == pytest.approx(3.0)
+    assert jobs_processor.get_seconds_per_page("NewJob") == pytest.approx(115.0 / 15)
+
+
+def test_seconds_per_page_without_history():
+    assert JobsProcessor().get_seconds_per_page("Job") is None
+
+
+def test_run_ocr_uses_indexed_page_count(source_dir, make_pdf, fake_ocrmypdf):
+    file_path = make_pdf(source_dir / "scan.pdf", pages=3)
+    jobs_processor = JobsProcessor()
+    jobs_processor.pdf_index.get(file_path)
+
+    assert jobs_processor.run_ocr(make_job(source_dir), file_path)
+
+    assert len(fake_ocrmypdf[0]) == 1
+    history = load_list_from_json(PT.get_path_of_ocr_history_json())
+    assert [(entry["job_name"], entry["file_name"], entry["pages"]) for entry in history] == [("Job", "scan.pdf", 3)]
+    assert jobs_processor.ocr_history == history
+    assert str(file_path) not in jobs_processor.pdf_index.entries
+
+
+def test_run_ocr_counts_pages_without_index(source_dir, make_pdf, fake_ocrmypdf):
+    file_path = make_pdf(source_dir / "scan.pdf", pages=2)
+    jobs_processor = JobsProcessor()
+
+    assert jobs_processor.run_ocr(make_job(source_dir), file_path)
+
+    history = load_list_from_json(PT.get_path_of_ocr_history_json())
+    assert [entry["pages"] for entry in history] == [2]
+    assert jobs_processor.pdf_index.entries == {}
+
+
+def test_run_ocr_always_calls_ocrmypdf(source_dir, make_pdf, fake_ocrmypdf):
+    file_path = make_pdf(source_dir / "text.pdf", INTERIOR_TEXT)
+    jobs_processor = JobsProcessor()
+    assert jobs_processor.pdf_index.get(file_path).has_text
+    calls, state = fake_ocrmypdf
+    state["returncode"] = 6
+
+    assert jobs_processor.run_ocr(make_job(source_dir), file_path)
+
+    assert len(calls) == 1
+    assert load_list_from_json(PT.get_path_of_ocr_history_json()) == []
+    assert jobs_processor.pdf_index.get_if_indexed(file_path) is not None
+
+
+def test_run_ocr_failure(source_dir, make_pdf, fake_ocrmypdf):
+    file_path = make_pdf(source_dir / "scan.pdf")
+    fake_ocrmypdf[1]["returncode"] = 2
+
+    assert not JobsProcessor().run_ocr(make_job(source_dir), file_path)
+    assert load_list_from_json(PT.get_path_of_ocr_history_json()) == []
+
+
+def test_process_marks_files_done(project_dirs, source_dir, make_pdf, fake_ocrmypdf):
+    config_dir, _ = project_dirs
+    make_pdf(source_dir / "scan.pdf", pages=2)
+    (config_dir / "job_defs.json").write_bytes(
+        orjson.dumps([{"name": "Job", "sources": str(source_dir), "copy_mode": "no_copy"}])
+    )
+
+    JobsProcessor().process()
+    JobsProcessor().process()
+
+    assert len(fake_ocrmypdf[0]) == 1
+    assert load_list_from_json(PT.get_path_of_done_files_json()) == [{"file_name": "scan.pdf", "job_name": "Job"}]
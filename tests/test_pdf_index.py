@@ -0,0 +1,178 @@
+import os
+
+import pikepdf
+import pytest
+
+import auto_ocr.pdf_index
+from auto_ocr.pdf_index import PdfIndex, read_pdf_info
+
+INTERIOR_TEXT = b"BT /F1 12 Tf 200 400 Td (Hello World) Tj ET"
+
+
+def read_info(file_path):
+    return read_pdf_info(file_path, os.stat(file_path))
+
+
+@pytest.fixture
+def count_reads(monkeypatch):
+    """Count how often PDFs get opened by the index"""
+    calls = []
+
+    def _read_pdf_info(file_path, stat_result):
+        calls.append(file_path)
+        return read_pdf_info(file_path, stat_result)
+
+    monkeypatch.setattr(auto_ocr.pdf_index, "read_pdf_info", _read_pdf_info)
+    return calls
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"", id="blank"),
+        pytest.param(b"BT /F1 8 Tf 40 20 Td (Scanned 2024-01-01 Page 1) Tj ET", id="scanner-footer"),
+        pytest.param(b"BT /F1 8 Tf 40 820 Td (FAX 0123 456789) Tj ET", id="fax-header"),
+        pytest.param(b"BT /F1 8 Tf 560 400 Td (ABC000123) Tj ET", id="bates-stamp-right-margin"),
+        pytest.param(b"BT /F1 12 Tf 200 400 Td () Tj ET", id="empty-string-in-interior"),
+    ],
+)
+def test_page_without_interior_text_needs_ocr(tmp_path, make_pdf, content):
+    info = read_info(make_pdf(tmp_path / "scan.pdf", content))
+
+    assert info.pages == 1
+    assert not info.has_text
+    assert not info.text_unknown
+
+
+def test_page_with_interior_text_has_text(tmp_path, make_pdf):
+    file_path = make_pdf(tmp_path / "text.pdf", b"BT /F1 8 Tf 40 20 Td (Scanned 2024-01-01) Tj ET " + INTERIOR_TEXT)
+
+    info = read_info(file_path)
+
+    assert info.pages == 1
+    assert info.has_text
+
+
+def test_unreadable_file(tmp_path):
+    file_path = tmp_path / "broken.pdf"
+    file_path.write_bytes(b"not a pdf")
+
+    info = read_info(file_path)
+
+    assert not info.readable
+    assert not info.has_text
+
+
+def test_encrypted_file(tmp_path, make_pdf):
+    file_path = make_pdf(tmp_path / "secret.pdf", encryption=pikepdf.Encryption(owner="owner", user="user"))
+
+    info = read_info(file_path)
+
+    assert not info.readable
+    assert info.encrypted
+
+
+def test_failing_text_analysis_is_recorded(tmp_path, make_pdf):
+    # pdfminer can not load a Type3 font without a /FontBBox, pikepdf does not care
+    type3_font = pikepdf.Dictionary(
+        Type=pikepdf.Name.Font,
+        Subtype=pikepdf.Name.Type3,
+        FontMatrix=[0.001, 0, 0, 0.001, 0, 0],
+        CharProcs=pikepdf.Dictionary(),
+        Encoding=pikepdf.Dictionary(Differences=[65, pikepdf.Name.A]),
+        FirstChar=65,
+        LastChar=65,
+        Widths=[1000],
+    )
+    file_path = make_pdf(tmp_path / "type3.pdf", b"BT /F3 12 Tf 200 400 Td (A) Tj ET", fonts={"/F3": type3_font})
+
+    info = read_info(file_path)
+
+    assert info.pages == 1
+    assert info.text_unknown
+    assert not info.has_text
+
+
+def test_truncated_file_has_unknown_text(tmp_path, make_pdf):
+    file_path = make_pdf(tmp_path / "truncated.pdf", INTERIOR_TEXT)
+    pdf_bytes = file_path.read_bytes()
+    file_path.write_bytes(pdf_bytes[: int(len(pdf_bytes) * 0.8)])
+
+    info = read_info(file_path)
+
+    assert info.pages == 1
+    assert info.text_unknown
+    assert not info.has_text
+
+
+def test_index_reuses_unchanged_entries(tmp_path, make_pdf, count_reads):
+    file_path = make_pdf(tmp_path / "text.pdf", INTERIOR_TEXT)
+    pdf_index = PdfIndex()
+
+    assert pdf_index.get(file_path).has_text
+    assert pdf_index.get(file_path).has_text
+    assert len(count_reads) == 1
+
+
+def test_index_rereads_changed_files(tmp_path, make_pdf, count_reads):
+    file_path = make_pdf(tmp_path / "scan.pdf")
+    pdf_index = PdfIndex()
+    assert not pdf_index.get(file_path).has_text
+
+    make_pdf(file_path, INTERIOR_TEXT, pages=2)
+
+    info = pdf_index.get(file_path)
+    assert info.has_text
+    assert info.pages == 2
+    assert len(count_reads) == 2
+
+
+def test_index_lookup_never_opens_files(tmp_path, make_pdf, count_reads):
+    file_path = make_pdf(tmp_path / "scan.pdf")
+    pdf_index = PdfIndex()
+
+    assert pdf_index.get_if_indexed(file_path) is None
+    pdf_index.get(file_path)
+    assert pdf_index.get_if_indexed(file_path) is not None
+
+    make_pdf(file_path, INTERIOR_TEXT)
+    assert pdf_index.get_if_indexed(file_path) is None
+    assert len(count_reads) == 1
+
+
+def test_index_is_persisted(tmp_path, make_pdf, count_reads):
+    text_path = make_pdf(tmp_path / "text.pdf", INTERIOR_TEXT)
+    scan_path = make_pdf(tmp_path / "scan.pdf", pages=3)
+    pdf_index = PdfIndex()
+    pdf_index.get(text_path)
+    pdf_index.get(scan_path)
+    pdf_index.save()
+
+    reloaded_index = PdfIndex()
+
+    assert reloaded_index.get(text_path).has_text
+    assert reloaded_index.get(scan_path).pages == 3
+    assert len(count_reads) == 2
+
+
+def test_index_removes_entries(tmp_path, make_pdf):
+    file_path = make_pdf(tmp_path / "scan.pdf")
+    pdf_index = PdfIndex()
+    pdf_index.get(file_path)
+    pdf_index.save()
+
+    pdf_index.remove(file_path)
+    pdf_index.save()
+
+    assert PdfIndex().get_if_indexed(file_path) is None
+
+
+def test_index_is_saved_periodically(tmp_path, make_pdf, monkeypatch):
+    monkeypatch.setattr(auto_ocr.pdf_index, "SAVE_INTERVAL", 2)
+    pdf_index = PdfIndex()
+    pdf_index.get(make_pdf(tmp_path / "first.pdf"))
+    assert PdfIndex().entries == {}
+
+    pdf_index.get(make_pdf(tmp_path / "second.pdf"))
+
+    assert len(PdfIndex().entries) == 2